@@ -1,6 +1,8 @@
 """
 Database Handler Base on cx_Oracle
 
+Requires cx_Oracle>=8.0 (cursor.prefetchrows, DB_TYPE_* constants). pyarrow is optional.
+
 @author: xiang
 """
 
@@ -9,7 +11,165 @@ import pandas as pd
 import datetime
 import tempfile
 import re
+import sys
+import os
+import uuid
+import subprocess
+import itertools
+import collections
+import queue
+import threading
+import atexit
 import cx_Oracle
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+if pa is not None:
+    ## permissive promote (int+float chunks) needs pyarrow>=14
+    _PA_MAJOR = int(pa.__version__.split('.')[0])
+    _ARROW_CONCAT = {'promote_options': 'permissive'} if _PA_MAJOR >= 14 else {'promote': True}
+    ## match the timestamp unit pandas infers from python datetime: us on pandas>=3, ns before.
+    ## pyarrow<13 always converts to ns
+    _PD_MAJOR = int(pd.__version__.split('.')[0])
+    _ARROW_TO_NS = (_PD_MAJOR < 3) or (_PA_MAJOR < 13)
+    _ARROW_TO_PANDAS = {'coerce_temporal_nanoseconds': True} if (_PD_MAJOR < 3) and (_PA_MAJOR >= 13) else {}
+
+## precompiled patterns used by db_execute
+_QMARK = re.compile(r'\?')
+_RE_CRLF = re.compile(r'[\r\n]')
+_RE_WS = re.compile(r'\s{2,}')
+_FROM_JOIN = re.compile(r'\b(?:from|join)(\s*\(|[^\w])', re.I) # group 1 ends with ( for subselect
+_RE_SELECT = re.compile(r'^\s*(/\*.*?\*/\s*)?select', re.I | re.S) # optional leading /* hint */
+
+## column types pyarrow can build directly from fetched values, anything else (LOB, object...) stays on pandas path
+_ARROW_TYPES = (cx_Oracle.DB_TYPE_NUMBER, cx_Oracle.DB_TYPE_BINARY_DOUBLE, cx_Oracle.DB_TYPE_BINARY_FLOAT,
+                cx_Oracle.DB_TYPE_BINARY_INTEGER, cx_Oracle.DB_TYPE_VARCHAR, cx_Oracle.DB_TYPE_NVARCHAR,
+                cx_Oracle.DB_TYPE_CHAR, cx_Oracle.DB_TYPE_NCHAR, cx_Oracle.DB_TYPE_DATE,
+                cx_Oracle.DB_TYPE_TIMESTAMP)
+
+def _output_type_handler(cursor, name, default_type, size, precision, scale):
+    ## fetch fixed-scale NUMBER as native double/integer instead of converting from Oracle decimal
+    if default_type == cx_Oracle.DB_TYPE_NUMBER:
+        if scale > 0:
+            return cursor.var(cx_Oracle.NATIVE_FLOAT, arraysize = cursor.arraysize)
+        if scale == 0 and 0 < precision <= 18:
+            return cursor.var(cx_Oracle.NATIVE_INT, arraysize = cursor.arraysize)
+    return None # keep driver default
+
+## verbose log files are written by a background thread so the caller never waits on disk
+_log_queue = queue.Queue()
+_log_lock = threading.Lock()
+_log_writer = None
+
+_BIND_LOG_CHUNK = 8192 # bind values per log string
+_LOG_POOL_SIZE = 16 # log files reused round robin when tmpdir is given
+
+def _write_log():
+    while True:
+        target, parts = _log_queue.get()
+        try:
+            if isinstance(target, str):
+                with open(target, 'w', buffering = 1 << 16) as logger:
+                    logger.writelines(parts) # parts are coalesced by the 64KB file buffer
+            else:
+                ## pooled log file: overwrite previous content in place
+                target.seek(0)
+                target.truncate()
+                target.writelines(parts)
+                target.flush()
+        except Exception as e:
+            print('Log write failed:{}'.format(e))
+        finally:
+            _log_queue.task_done()
+
+def _submit_log(target, parts):
+    global _log_writer
+    with _log_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target = _write_log, name = 'SQLLogWriter', daemon = True)
+            _log_writer.start()
+            atexit.register(_log_queue.join) # flush pending logs before interpreter exit
+    _log_queue.put((target, parts))
+
+def _format_bind(bind_value):
+    ## str() bind values in fixed-size slices so large IN-lists never build one huge string
+    ## iterate instead of slicing so named binds (dict) log their keys as before
+    parts = []
+    values = iter(bind_value)
+    while True:
+        chunk = list(itertools.islice(values, _BIND_LOG_CHUNK))
+        if not chunk:
+            break
+        if parts:
+            parts.append("\n")
+        parts.append("\n".join(map(str, chunk)))
+    return parts
+
+try:
+    _DEVNULL_STAT = os.stat(os.devnull)
+except OSError:
+    _DEVNULL_STAT = None
+
+def _console_active():
+    ## False when nobody reads stdout: no stream (pythonw) or stream pointing at the null device
+    if sys.stdout is None:
+        return False
+    if _DEVNULL_STAT is None:
+        return True
+    try:
+        return not os.path.samestat(os.fstat(sys.stdout.fileno()), _DEVNULL_STAT)
+    except (AttributeError, OSError, ValueError):
+        return True # stream without file descriptor, e.g. notebook
+
+def _format_query(query):
+    ## Truncate SQL for console. Make sure table name and join method got printed
+    queryMsg = _RE_CRLF.sub(' ', query) ## remove line splitter
+    queryMsg = _RE_WS.sub(' ', queryMsg) ## remove more than 1 white space
+    ## first from/join not followed by subselect, else first from/join. Stop scanning once found
+    first_pos = None
+    for matchobj in _FROM_JOIN.finditer(queryMsg):
+        if not matchobj.group(1).endswith('('):
+            first_pos = matchobj.start()
+            break
+        if first_pos is None:
+            first_pos = matchobj.start()
+
+    if (first_pos is None) or (first_pos <3):
+        # 'from' < 35. Only truncate the too long string
+        if(len(queryMsg) >86):
+            queryMsg = queryMsg[:83] + '...'
+    else:
+        # from >35. paste first 30 with 50 after 'from'
+        trim_end = len(queryMsg) > first_pos + 55
+        if trim_end:
+            queryMsg = queryMsg[:30] + '...' + queryMsg[(first_pos):(first_pos+50)] + '...'
+        else:
+            queryMsg = queryMsg[:30] + '...' + queryMsg[(first_pos):]
+    return queryMsg
+
+def _outside_ns_range(table):
+    ## timestamp beyond datetime64[ns] range (e.g. 9999-12-31 end date) can't be cast to nanosecond
+    lower, upper = pd.Timestamp.min.to_pydatetime(), pd.Timestamp.max.to_pydatetime()
+    for column in table.columns:
+        if pa.types.is_timestamp(column.type):
+            minmax = pc.min_max(column)
+            low, high = minmax['min'].as_py(), minmax['max'].as_py()
+            if (low is not None) and (low < lower or high > upper):
+                return True
+    return False
+
+def _match_columns(columns, patterns):
+    ## map each column to the value of the first pattern it matches, compiling every pattern once
+    compiled = [(re.compile(r'{}'.format(pattern), re.I), value) for pattern, value in (patterns or {}).items()]
+    matched = {}
+    for column in columns:
+        for regex, value in compiled:
+            if regex.match(column) is not None:
+                matched[column] = value
+                break
+    return matched
 
 class db_handler_base:
     """
@@ -20,20 +180,26 @@ class db_handler_base:
         uid: user id
         pwd: password
         verbose: if True, output SQL and result stats to console and write log to tmpdir
-        tmpdir: directory to write log file
-        reconnection_interval: automatically reconnect if exceed time interval
+        tmpdir: directory to write log file, if given each handler reuses SQLLog_000~015 round robin
+                in its own SQLLog* subdirectory
+        reconnection_interval: ping session if idle longer than interval(minutes), reconnect if ping fails
+        fetch_chunk: number of rows fetched per round trip
     function:
-        reconnect: reconnect if exceed time interval when execute
-        check_connection: check whether exceed time interval
+        reconnect: drop current session and acquire a fresh one from session pool
+        check_connection: ping session if idle longer than time interval, reconnect if it is lost
         db_execute: write log file, output to console, execute SQL query, and return result.
+        close: flush pending logs, close log files, release session and close session pool
     Return:
         result: if select return raw result
     """
-    def __init__(self, connection, uid, pwd, verbose = False, tmpdir = None, reconnection_interval = None):
+    def __init__(self, connection, uid, pwd, verbose = False, tmpdir = None, reconnection_interval = None,
+                 fetch_chunk = 10000):
         try:
             self.connectionConfig = str(uid) + '/' + str(pwd) + '@' + str(connection)
-            self.conn = cx_Oracle.connect( self.connectionConfig)
-            self.cursor = self.conn.cursor()
+            self.pool = cx_Oracle.SessionPool(user = uid, password = pwd, dsn = connection,
+                                              min = 1, max = 4, increment = 1,
+                                              getmode = cx_Oracle.SPOOL_ATTRVAL_WAIT)
+            self._acquire()
             print('Connect to {} now'.format(connection))
         except Exception as e:
             print("Fail to build connection with {}".format(connection))
@@ -41,93 +207,203 @@ class db_handler_base:
         self.connection = connection
         self.verbose = verbose
         self.tmpdir = tmpdir
-        self.connection_time = datetime.datetime.now()
         self.reconnection_interval = reconnection_interval #Interval in minutes
+        self.fetch_chunk = fetch_chunk
+        self._log_pool = None
+        if verbose and tmpdir:
+            ## own subdirectory per handler so handlers/processes sharing tmpdir never overwrite each other,
+            ## files are only created on first use
+            logdir = tempfile.mkdtemp(dir = tmpdir, prefix = 'SQLLog')
+            self._log_pool = collections.deque([os.path.join(logdir, 'SQLLog_{:03d}.txt'.format(i))
+                                                for i in range(_LOG_POOL_SIZE)])
+
+    def _acquire(self):
+        self.conn = self.pool.acquire()
+        self.conn.outputtypehandler = _output_type_handler
+        self.cursor = self.conn.cursor()
+        self.connection_time = datetime.datetime.now()
 
     def reconnect(self):
         try:
             self.cursor.close()
-            self.conn.close()
         except Exception as e:
-            print('Disconnection Failed:{}',format(e))
-        self.conn = cx_Oracle.connect( self.connectionConfig)
-        self.cursor = self.conn.cursor()
-        self.connection_time = datetime.datetime.now()
+            print('Disconnection Failed:{}'.format(e))
+        finally:
+            try:
+                self.pool.drop(self.conn) # session is stale, don't return it to the pool
+            except Exception as e:
+                print('Disconnection Failed:{}'.format(e))
+        self._acquire()
 
     def check_connection(self):
         if (self.reconnection_interval is not None):
-            diff = self.connection_time - datetime.datetime.now()
-            if( diff.seconds/60 > self.reconnection_interval):
-                print('Reconnecting {} minutes reconnect interval'.format(self.reconnection_interval))
-                self.reconnect()
+            diff = datetime.datetime.now() - self.connection_time
+            if( diff.total_seconds()/60 > self.reconnection_interval):
+                try:
+                    self.conn.ping()
+                    self.connection_time = datetime.datetime.now()
+                except cx_Oracle.Error:
+                    print('Reconnecting, session lost after {} minutes'.format(self.reconnection_interval))
+                    self.reconnect()
+
+    def close(self):
+        _log_queue.join() # writer thread may still hold a pooled log file
+        if self._log_pool is not None:
+            for logger in self._log_pool:
+                if not isinstance(logger, str):
+                    logger.close()
+            self._log_pool = None
+        try:
+            self.cursor.close()
+            self.pool.release(self.conn)
+            self.pool.close()
+        except Exception as e:
+            print('Disconnection Failed:{}'.format(e))
 
     def db_execute(self, query, bind_value):
+        console = self.verbose and _console_active()
         if (self.verbose):
-            ## Creating temporary file for SQL Log: Query + Bind_variable + Run Time + Records
-            with tempfile.NamedTemporaryFile(delete = False, dir = self.tmpdir, mode = 'wt',
-                                             prefix= 'SQLLog', suffix = '.txt' ) as logger:
-                logger.writelines("=" * 10 + "SQL" + "=" * 10 + "\n")
-                logger.writelines(query)
-                logger.writelines("\n" + "=" * 10 + "DATA" + "=" * 10 + "\n")
-                logger.writelines("\n".join([str(date) for date in bind_value]))
-                print("Log query in", logger.name)
+            ## SQL Log: Query + Bind_variable + Run Time + Records
+            ## log content is buffered and written in one go by the writer thread
+            if self._log_pool is not None:
+                log_target = self._log_pool[0]
+                if isinstance(log_target, str):
+                    log_target = self._log_pool[0] = open(log_target, 'w', buffering = 1 << 16)
+                self._log_pool.rotate(-1)
+                log_name = log_target.name
+            else:
+                log_name = os.path.join(self.tmpdir or tempfile.gettempdir(),
+                                        'SQLLog{}.txt'.format(uuid.uuid4().hex[:12]))
+                log_target = log_name
+            log_parts = ["=" * 10 + "SQL" + "=" * 10 + "\n",
+                         query,
+                         "\n" + "=" * 10 + "DATA" + "=" * 10 + "\n"]
+            log_parts.extend(_format_bind(bind_value))
+            if (console):
+                print("Log query in", log_name)
 
-        ## replace ? with bind variable
-        if (len(bind_value) >0) :
-            ## replace ? with :1, :2 bind variable
-            for bind_id in range(len(bind_value)):
-                query = re.compile(r'\?').sub(":"+ str(bind_id), query, count = 1) # replace ? one at a time
+        ## list of rows as bind value: bulk DML through executemany
+        bulk = (isinstance(bind_value, (list, tuple)) and (len(bind_value) >0)
+                and isinstance(bind_value[0], (list, tuple)))
+        bind_count = len(bind_value[0]) if bulk else len(bind_value)
 
-        ## Truncate SQL and output to console. Make sure table name and join method got printed
-        if (self.verbose):
-            queryMsg = re.compile(r'[\r\n]').sub(' ', query) ## remove line splitter
-            queryMsg = re.compile(r'\s{2,}').sub(' ', queryMsg) ## remove more than 1 white space
-            source_all = [matchobj.start() for matchobj in re.compile(r'\b(from|join)[^\w]', re.I ).finditer(queryMsg)]##find from or join
-            source_subselect = [matchobj.start() for matchobj in re.compile(r'\b(from|join)\s*\(', re.I).finditer(queryMsg)]
-            source_remain = list(set(source_all) - set(source_subselect))
-
-            first_pos = source_all[0] if (len(source_remain)==0) else source_remain[0]
-
-            if ( (first_pos is None) | first_pos <3):
-                # 'from' < 35. Only truncate the too long string
-                if(len(queryMsg) >86):
-                    queryMsg = queryMsg[:83] + '...'
-            else:
-                # from >35. paste first 30 with 50 after 'from'
-                trim_end = len(queryMsg) > first_pos + 55
-                if trim_end:
-                    queryMsg = queryMsg[:30] + '...' + queryMsg[(first_pos):(first_pos+50)] + '...'
-                else:
-                    queryMsg = queryMsg[:30] + '...' + queryMsg[(first_pos):]
+        ## replace ? with bind variable
+        if (bind_count >0) :
+            ## replace ? with :0, :1 bind variable in a single pass
+            counter = itertools.count()
+            query = _QMARK.sub(lambda matchobj: ":" + str(next(counter)), query, count = bind_count)
 
-            print('[{:%Y-%m-%d %H:%M:%S}] Query [{}]'.format(datetime.datetime.now(), queryMsg))
+        ## Truncate SQL and output to console, formatting only happens when console output is read
+        if (console):
+            print('[{:%Y-%m-%d %H:%M:%S}] Query [{}]'.format(datetime.datetime.now(), _format_query(query)))
 
-            ## fetching data
-            result = None
-            start_time = datetime.datetime.now()
-            self.cursor.execute(query, bind_value)
+        ## fetching data
+        result = None
+        start_time = datetime.datetime.now()
+        self.cursor.arraysize = self.fetch_chunk
+        self.cursor.prefetchrows = self.fetch_chunk + 1
+        try:
+            if bulk:
+                self._execute_many(query, bind_value)
+            else:
+                self.cursor.execute(query, bind_value)
+        except Exception:
+            if (self.verbose):
+                _submit_log(log_target, log_parts) # keep the failing SQL in the log
+            raise
+        if self.cursor.description is not None:
             colname = [col[0].lower() for col in self.cursor.description] #change colname to lower
-            result = self.cursor.fetchall()
-            result = pd.DataFrame(result, columns = colname)
+            if (pa is not None) and all(col[1] in _ARROW_TYPES for col in self.cursor.description):
+                result = self._fetch_arrow(colname)
+            else:
+                result = self._fetch_frame(colname)
+        self.connection_time = datetime.datetime.now() # session proven alive, idle time restarts
 
         ## output RunTime and # of records to console
         if (self.verbose):
             timeElapsed = np.round( (datetime.datetime.now() - start_time).seconds)
-            SelectFlag = re.compile(r'^\s*(/\\*.*?\\*/\s*)?select', re.I).search(query)
+            SelectFlag = _RE_SELECT.search(query)
             records = '{} records'.format(result.shape[0]) if (result is not None) & (SelectFlag is not None) else ""
-            print('Took {}s - {}'.format(timeElapsed, records))
+            if (console):
+                print('Took {}s - {}'.format(timeElapsed, records))
 
         if (self.verbose):
-            with open(logger.name, 'a') as logger:
-                ## output RunTime and # of records to log file
-                logger.writelines("\n\n\n" + "=" * 10 + "INFO" + "=" * 10 + "\n")
-                logger.writelines("{} seconds \n{}".format(timeElapsed, records))
-                print("Log result in", logger.name)
+            ## output RunTime and # of records to log file
+            log_parts.append("\n\n\n" + "=" * 10 + "INFO" + "=" * 10 + "\n")
+            log_parts.append("{} seconds \n{}".format(timeElapsed, records))
+            _submit_log(log_target, log_parts)
+            if (console):
+                print("Log result in", log_name)
 
         return result
 
+    def _execute_many(self, query, bind_value):
+        ## array bind in batches of fetch_chunk rows, one round trip per batch instead of per row
+        self.cursor.bindarraysize = min(len(bind_value), self.fetch_chunk)
+        for start in range(0, len(bind_value), self.fetch_chunk):
+            self.cursor.executemany(query, bind_value[start:start + self.fetch_chunk]) # first bad row raises
 
-class db_handler:
+    def _fetch_arrow(self, colname):
+        ## build each fetched chunk as arrow columns and let arrow hand buffers to pandas
+        names = [str(i) for i in range(len(colname))]
+        tables = []
+        while True:
+            chunk = self.cursor.fetchmany()
+            if not chunk:
+                break
+            try:
+                tables.append(pa.table([pa.array(values) for values in zip(*chunk)], names = names))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+                ## value arrow can't hold (e.g. int beyond int64): finish this query on pandas path
+                cols = self._arrow_to_columns(tables, colname)
+                for col, values in zip(cols, zip(*chunk)):
+                    col.extend(values)
+                return self._fetch_frame(colname, cols)
+        if not tables:
+            return pd.DataFrame(columns = colname)
+        ## promote: all-null chunk + typed chunk, int chunk + float chunk
+        try:
+            table = pa.concat_tables(tables, **_ARROW_CONCAT)
+        except pa.ArrowInvalid:
+            return self._fetch_frame(colname, self._arrow_to_columns(tables, colname))
+        tables.clear()
+        ## check before to_pandas: self_destruct consumes the table, so conversion can't be retried
+        if _ARROW_TO_NS and _outside_ns_range(table):
+            return self._fetch_frame(colname, self._arrow_to_columns([table], colname))
+        result = table.to_pandas(self_destruct = True, split_blocks = True, **_ARROW_TO_PANDAS)
+        result.columns = colname
+        return result
+
+    def _arrow_to_columns(self, tables, colname):
+        ## hand rows already built as arrow back as python column lists
+        cols = [[] for _ in colname]
+        for table in tables:
+            for col, values in zip(cols, table.columns):
+                col.extend(values.to_pylist())
+        tables.clear()
+        return cols
+
+    def _fetch_frame(self, colname, cols = None):
+        ## fetch in chunks of arraysize and collect column-wise, skip row->column transpose in pandas
+        if cols is None:
+            cols = [[] for _ in colname]
+        while True:
+            chunk = self.cursor.fetchmany()
+            if not chunk:
+                break
+            for col, values in zip(cols, zip(*chunk)):
+                col.extend(values)
+        ## convert column by column and drop each python list right away, peak holds one column of objects
+        data = {}
+        for i in range(len(cols)):
+            data[i] = pd.Series(cols[i])
+            cols[i] = None
+        result = pd.DataFrame(data, copy = False)
+        result.columns = colname
+        return result
+
+
+class db_handler(db_handler_base):
     """
     Add all kinds of SQL statement, including select, execute[delete/update/truncate]
     Add create table/drop table function
@@ -140,74 +416,128 @@ class db_handler:
         verbose: if True, output SQL and result stats to console and write log to tmpdir
         tmpdir: directory to write log file
         reconnection_interval: automatically reconnect if exceed time interval
-        bind_value: pass in value for bind variable
+        fetch_chunk: number of rows fetched per round trip
+        bind_value: pass in value for bind variable, list of rows runs execute as bulk DML
         nahandle: dictionary {column: nafill} how to fill in nan for column specified
-        cast: dictionary{column:dtype} how to coerce datatype for column specified
+        cast: dictionary{column:dtype} how to coerce datatype for column specified,
+              date rule can carry strftime format to skip format inference, e.g. 'datetime:%Y-%m-%d'
+        data: DataFrame to load into table_name with SQL*Loader direct path
+        parallel: pass parallel=true to sqlldr, only for tables without index
 
     Returns:
         result, after cleaning na column and transfrom datatype.
         cursor, Oracle API
 
     """
-    def __init__(self, connection, uid, pwd, verbose = False, tmpdir = None, reconnection_interval = None):
-        super(db_handler,self).__init__(connection, uid, pwd, verbose, tmpdir, reconnection_interval)
-
     def execute(self, query, bind_value):
         self.check_connection()
-        self.db_execute(query, bind_value)
+        return self.db_execute(query, bind_value)
 
     def select(self, query, bind_value, nahandle = None, cast = None):
         self.check_connection()
 
         # Fetch data
         result = self.db_execute(query, bind_value)
-        if (result is None) or (result.shape[0]==0) or not cast:
+        if (result is None) or (result.shape[0]==0) or not (nahandle or cast):
             return result
 
         ## NA handling before cast data type
-        nacount = result.isnull().sum()
-        for naPattern, fillvalue in nahandle.items():
-            match = [ colname for colname in result.columns
-                     if  re.compile(r'{}'.format(naPattern), re.I).match(colname) is not None ]
-            if len(match)==0:
-                continue
-            for column in match:
-                if nacount[column] == 0:
-                    continue # no NAN
-                else:
-                    print('FillNA {} [{}] with [{}]'.format(column, nacount[column], fillvalue))
-                    result.loc[:,column] = result.loc[:,column].fillna(fillvalue)
+        fill_map = {}
+        for column, fillvalue in _match_columns(result.columns, nahandle).items():
+            nacol = result[column].isna()
+            if not nacol.any():
+                continue # no NAN
+            print('FillNA {} [{}] with [{}]'.format(column, nacol.sum(), fillvalue))
+            fill_map[column] = fillvalue
+        if fill_map:
+            result.fillna(value = fill_map, inplace = True)
 
         # coerce column type, according to cast
         # Panda column type  int64/float64/bool/datetime64/object
         datatype = result.dtypes
-        for castPattern, rule in cast.items():
-            match = [ colname for colname in result.columns
-                     if  re.compile(r'{}'.format(castPattern), re.I).match(colname) is not None ]
-            if len(match)==0:
-                continue
-            for column in match:
-                if datatype[column] == rule:
-                    continue # same data type
-                else:
-                    print('Convert {} [{}] to [{}]'.format(column,datatype[column],rule))
-                    if ( re.compile(r'^int').match(rule) ):
-                        result.loc[:,column] = pd.to_numeric(result.loc[:, column],
-                                                              downcast = 'integer',
-                                                              errors = 'coerce')
-                    elif( re.compile(r'^float').match(rule) ):
-                        result.loc[:,column] = pd.to_numeric(result.loc[:, column],
-                                      downcast = 'float',
-                                      errors = 'coerce')
-                    elif ( re.compile(r'^(date|time)').match(rule) ):
-                        result.loc[:,column] = pd.to_datetime(result.loc[:, column],
-                                                              errors = 'coerce')
-                    else:
-                        print('Currently only int/float/datetime are supported')
+        new_cols = {}
+        for column, rule in _match_columns(result.columns, cast).items():
+            rule, _, fmt = rule.partition(':') # 'datetime:%Y-%m-%d' -> explicit parse format
+            if datatype[column] == rule:
+                continue # same data type
+            print('Convert {} [{}] to [{}]'.format(column,datatype[column],rule))
+            if rule.startswith('int'):
+                new_cols[column] = pd.to_numeric(result[column], downcast = 'integer', errors = 'coerce')
+            elif rule.startswith('float'):
+                new_cols[column] = pd.to_numeric(result[column], downcast = 'float', errors = 'coerce')
+            elif rule.startswith(('date', 'time')):
+                new_cols[column] = pd.to_datetime(result[column], format = fmt or None, errors = 'coerce')
+            else:
+                print('Currently only int/float/datetime are supported')
+
+        ## plain column setitem replaces each converted column in place, assign() would deep-copy the frame first
+        for column, series in new_cols.items():
+            result[column] = series
         return result
 
     def gethandler(self):
         return self.cursor
 
-    def bs_sql_load(self, query, table_name):
-        raise NotImplementedError
+    def bs_sql_load(self, data, table_name, direct = True, parallel = False):
+        ## stage data file, control file and parfile in one directory, then run sqlldr
+        workdir = tempfile.mkdtemp(dir = self.tmpdir, prefix = 'SQLLoad')
+        data_file = os.path.join(workdir, table_name + '.dat')
+        ctl_file = os.path.join(workdir, table_name + '.ctl')
+        log_file = os.path.join(workdir, table_name + '.log')
+        bad_file = os.path.join(workdir, table_name + '.bad')
+        par_file = os.path.join(workdir, table_name + '.par')
+        try:
+            ## bool would be written as True/False which NUMBER column rejects, write 1/0 instead
+            bool_cols = {column: 'Int8' for column, dtype in data.dtypes.items()
+                         if pd.api.types.is_bool_dtype(dtype)}
+            if bool_cols:
+                data = data.astype(bool_cols)
+
+            ## one aggregated data file, streamed through a 64MB buffer so it reaches disk in large writes
+            with open(data_file, 'w', buffering = 1 << 26, newline = '') as f:
+                data.to_csv(f, header = False, index = False, chunksize = 100000,
+                            date_format = '%Y-%m-%d %H:%M:%S')
+
+            ## column spec from dtype: datetime with explicit mask, text wider than sqlldr default CHAR(255)
+            fields = []
+            for column, dtype in data.dtypes.items():
+                if pd.api.types.is_datetime64_any_dtype(dtype):
+                    fields.append('{} DATE "YYYY-MM-DD HH24:MI:SS"'.format(column))
+                elif pd.api.types.is_string_dtype(dtype): # object and pandas str dtype
+                    fields.append('{} CHAR(4000)'.format(column))
+                else:
+                    fields.append('{}'.format(column))
+            with open(ctl_file, 'w') as f:
+                f.write("LOAD DATA\n"
+                        "INFILE '{}'\n"
+                        "BADFILE '{}'\n"
+                        "APPEND INTO TABLE {}\n"
+                        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'\n"
+                        "TRAILING NULLCOLS\n"
+                        "(\n{}\n)\n".format(data_file, bad_file, table_name, ",\n".join(fields)))
+
+            ## credentials go through parfile, not the command line visible in process list
+            with open(par_file, 'w') as f:
+                f.write("userid={}\ncontrol={}\nlog={}\n".format(self.connectionConfig, ctl_file, log_file))
+                if direct:
+                    f.write("direct=true\n")
+                    if parallel:
+                        ## only for concurrent loads into a table without index: parallel direct path can't maintain index
+                        f.write("parallel=true\n")
+
+            print('[{:%Y-%m-%d %H:%M:%S}] SQL Loader {} records into {}'.format(datetime.datetime.now(),
+                                                                                data.shape[0], table_name))
+            status = subprocess.run(['sqlldr', 'parfile=' + par_file],
+                                    stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, universal_newlines = True)
+        finally:
+            ## keep only log and bad file, data file is a full copy of data. Staging may have failed part way
+            for staged in (par_file, data_file, ctl_file):
+                if os.path.exists(staged):
+                    os.remove(staged)
+
+        ## sqlldr exit code: 0 success, 2 warning(rejected rows), 1/3 failure
+        if status.returncode != 0:
+            print('SQL Loader exit {} {}, check {}'.format(status.returncode, status.stderr.strip(), log_file))
+        else:
+            print('SQL Loader finished, log in', log_file)
+        return status.returncode